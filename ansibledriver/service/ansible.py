@@ -5,7 +5,6 @@ import os
 import tempfile
 from datetime import datetime
 from tempfile import NamedTemporaryFile
-from collections import namedtuple
 from ansible.parsing.dataloader import DataLoader
 from ansible.vars.manager import VariableManager
 from ansible.inventory.manager import InventoryManager
@@ -64,18 +63,6 @@ class AnsibleClient(Service, AnsibleClientCapability):
     self.event_logger = kwargs.get('event_logger')
 
   def run_playbook(self, request_id, connection_type, inventory_path, playbook_path, lifecycle, all_properties):
-    Options = namedtuple('Options', ['connection',
-                                     'forks',
-                                     'become',
-                                     'become_method',
-                                     'become_user',
-                                     'listhosts',
-                                     'listtasks',
-                                     'listtags',
-                                     'syntax',
-                                     'module_path',
-                                     'check',
-                                     'diff'])
     # initialize needed objects
     loader = DataLoader()
     
@@ -113,7 +100,7 @@ class AnsibleClient(Service, AnsibleClientCapability):
     pbex._tqm._stdout_callback = callback
 
     pbex.run()
-    logger.debug(f'Playbook finished {playbook_path}')
+    logger.debug('Playbook finished %s', playbook_path)
 
     return callback
 
@@ -148,7 +135,7 @@ class AnsibleClient(Service, AnsibleClientCapability):
         # entry to the property dictionary that maps the "[key_name].path" to the key file path
         key_property_processor.process_key_properties()
 
-        logger.debug(f'Handling request {request_id} with config_path: {config_path.get_path()} driver files path: {scripts_path.get_path()} resource properties: {resource_properties} system properties {system_properties} request properties {request_properties}')
+        logger.debug('Handling request %s with config_path: %s driver files path: %s resource properties: %s system properties %s request properties %s', request_id, config_path.get_path(), scripts_path.get_path(), resource_properties, system_properties, request_properties)
 
         all_properties = self.render_context_service.build(system_properties, resource_properties, request_properties, location.deployment_location(), associated_topology)
 
@@ -159,7 +146,7 @@ class AnsibleClient(Service, AnsibleClientCapability):
 
         for i in range(0, num_retries):
           if i>0:
-            logger.debug('Playbook {0}, unreachable retry attempt {1}/{2}'.format(playbook_path, i+1, num_retries))
+            logger.debug('Playbook %s, unreachable retry attempt %s/%s', playbook_path, i+1, num_retries)
           start_time = datetime.now()
           ret = self.run_playbook(request_id, location.connection_type, inventory.get_inventory_path(), playbook_path, lifecycle, all_properties)
           if not ret.host_unreachable:
@@ -192,10 +179,10 @@ class AnsibleClient(Service, AnsibleClientCapability):
       keep_files = request.get('keep_files', False)
       if not keep_files and driver_files is not None:
         try:
-          logger.debug('Attempting to remove lifecycle scripts at {0}'.format(driver_files.root_path))
+          logger.debug('Attempting to remove lifecycle scripts at %s', driver_files.root_path)
           driver_files.remove_all()
         except Exception as e:
-          logger.exception('Encountered an error whilst trying to clear out lifecycle scripts directory {0}: {1}'.format(driver_files.root_path, str(e)))
+          logger.exception('Encountered an error whilst trying to clear out lifecycle scripts directory %s: %s', driver_files.root_path, str(e))
 
 
 class ResultCallback(CallbackBase):
@@ -252,7 +239,7 @@ class ResultCallback(CallbackBase):
         Called when a play begins
         Note: ONE playbook can have MANY plays
         """
-        logger.debug('v2_playbook_on_play_start: {0}'.format(play))
+        logger.debug('v2_playbook_on_play_start: %s', play)
         if self.ansible_properties.log_progress_events:
             play_name = play.get_name().strip()
             event = PlayStartedEvent(play_name=play_name)
@@ -264,11 +251,11 @@ class ResultCallback(CallbackBase):
         Called when a task starts 
         Note: even if a task is going to run on multiple hosts, this function is only called ONCE
         """
-        logger.debug('v2_playbook_on_task_start: {0} (is_conditional={1})'.format(task, is_conditional))
+        logger.debug('v2_playbook_on_task_start: %s (is_conditional=%s)', task, is_conditional)
         self._log_task_start(task)
 
     def v2_playbook_on_handler_task_start(self, task):
-        logger.debug('v2_playbook_on_handler_task_start: {0}'.format(task))
+        logger.debug('v2_playbook_on_handler_task_start: %s', task)
         self._log_task_start(task, prefix='Handler/')
 
     def _log_task_start(self, task, prefix=None):
@@ -289,7 +276,7 @@ class ResultCallback(CallbackBase):
         """
         Called at the end of playbook execution (even in failure)
         """
-        logger.debug('v2_playbook_on_stats: {0}'.format(stats))
+        logger.debug('v2_playbook_on_stats: %s', stats)
         if self.ansible_properties.log_progress_events:
             hosts = sorted(stats.processed.keys())
             host_stats = {}
@@ -317,9 +304,9 @@ class ResultCallback(CallbackBase):
         """
         Called if a host is unreachable on execution of a task
         """
-        logger.debug('v2_runner_on_unreachable: {0}'.format(result._task))
+        logger.debug('v2_runner_on_unreachable: %s', result._task)
         self.__handle_unreachable(result)
-        logger.error('task: \'' + self.failed_task + '\' UNREACHABLE: ' + ' ansible playbook task ' + self.failed_task + ' host unreachable: ' + str(self.host_unreachable_log))
+        logger.error('task: \'%s\' UNREACHABLE:  ansible playbook task %s host unreachable: %s', self.failed_task, self.failed_task, self.host_unreachable_log)
 
     def _log_unreachable_event(self, result):
         if self.ansible_properties.log_progress_events:
@@ -345,7 +332,7 @@ class ResultCallback(CallbackBase):
         """
         Called when a var_prompt is used in a playbook, which we can't support because the playbook is not running in an interactive shell
         """
-        logger.debug('v2_playbook_on_vars_prompt: {0}'.format(varname))
+        logger.debug('v2_playbook_on_vars_prompt: %s', varname)
         if self.ansible_properties.log_progress_events:
             event = VarPromptEvent(var_name=varname)
             self.event_logger.add(event)
@@ -357,7 +344,7 @@ class ResultCallback(CallbackBase):
         """
         Called when a task is retried
         """
-        logger.debug('v2_runner_retry: {0}'.format(result))
+        logger.debug('v2_runner_retry: %s', result)
         if self.ansible_properties.log_progress_events:
             host_name = result._host.get_name().strip()
             delegated_vars = result._result.get('_ansible_delegated_vars', None)
@@ -374,7 +361,7 @@ class ResultCallback(CallbackBase):
         """
         Called when a task starts on a particular host (Ansible v2.8+)
         """
-        logger.debug('v2_runner_on_start: host={0}, task={1}'.format(host, task))
+        logger.debug('v2_runner_on_start: host=%s, task=%s', host, task)
         if self.ansible_properties.log_progress_events:
             task_name = task.get_name().strip()
             host_name = host.get_name().strip()
@@ -388,7 +375,7 @@ class ResultCallback(CallbackBase):
             self.event_logger.add(event)
 
     def runner_on_failed(self, host, res, ignore_errors=False):
-        logger.debug('runner_on_failed: host={0}, result={1}'.format(host, res))
+        logger.debug('runner_on_failed: host=%s, result=%s', host, res)
     
     def _log_event_for_failed_task(self, result, is_item=False):
         if self.ansible_properties.log_progress_events:
@@ -411,7 +398,7 @@ class ResultCallback(CallbackBase):
         """
         Called when task execution fails for an item in a loop (e.g. with_items)
         """
-        logger.debug('v2_runner_item_on_failed: {0}'.format(result))
+        logger.debug('v2_runner_item_on_failed: %s', result)
         self._log_event_for_failed_task(result, is_item=True)
 
     def v2_runner_on_failed(self, result, *args, **kwargs):
@@ -419,14 +406,14 @@ class ResultCallback(CallbackBase):
         Called when a task fails
         Note: even when a loop is used (so v2_runner_item_on_failed/v2_runner_item_on_ok is called for each item) this function is called at the end, when all items have been attempted but one has failed
         """
-        logger.debug("v2_runner_on_failed: task={0}, result={1}, task_fields={2}".format(result._task, result._result, result._task_fields))
+        logger.debug("v2_runner_on_failed: task=%s, result=%s, task_fields=%s", result._task, result._result, result._task_fields)
         # TODO: handle ignore_errors?
         self.failed_task = result._task.get_name()
         if 'msg' in result._result and 'Timeout' in result._result['msg'] and 'waiting for privilege escalation prompt' in result._result['msg']:
-            logger.info('Failure to be treated as unreachable:  task ' + str(self.failed_task) + ' failed: ' + str(result._result))
+            logger.info('Failure to be treated as unreachable:  task %s failed: %s', self.failed_task, result._result)
             self.__handle_unreachable(result)
         elif 'module_stderr' in result._result and result._result['module_stderr'].startswith('ssh:') and 'Host is unreachable' in result._result['module_stderr']:
-            logger.info('Failure to be treated as unreachable: task ' + str(self.failed_task) + ' failed: ' + str(result._result))
+            logger.info('Failure to be treated as unreachable: task %s failed: %s', self.failed_task, result._result)
             self.__handle_unreachable(result)
         else:
           self.host_failed = True
@@ -457,18 +444,18 @@ class ResultCallback(CallbackBase):
         """
         Called when task execution is skipped an item in a loop (e.g. with_items)
         """
-        logger.debug('v2_runner_item_on_skipped: {0}'.format(result))
+        logger.debug('v2_runner_item_on_skipped: %s', result)
         self._log_event_for_skipped_task(result, is_item=True)
 
     def v2_runner_on_skipped(self, result):
         """
         Called when task execution is skipped
         """
-        logger.debug('v2_runner_on_skipped: {0}'.format(result))
+        logger.debug('v2_runner_on_skipped: %s', result)
         self._log_event_for_skipped_task(result, is_item=True)
 
     def runner_on_ok(self, host, res):
-        logger.debug('runner_on_ok: host={0} res={1}'.format(host, res))
+        logger.debug('runner_on_ok: host=%s res=%s', host, res)
 
     def _log_event_for_ok_task(self, result, is_item=False):
         if self.ansible_properties.log_progress_events:
@@ -492,7 +479,7 @@ class ResultCallback(CallbackBase):
         """
         Called when task execution completes for an item in a loop (e.g. with_items)
         """
-        logger.debug('v2_runner_item_on_ok: {0}'.format(result))
+        logger.debug('v2_runner_item_on_ok: %s', result)
         if isinstance(result._task, TaskInclude):
             logger.debug('Skipping v2_runner_item_on_ok call for TaskInclude')
             return
@@ -503,7 +490,7 @@ class ResultCallback(CallbackBase):
         Called when task execution completes (called for each host the task executes against)
         Note: even when a loop is used (so v2_runner_item_on_ok is called for each successful item) this function is called at the end, when all items have succeeded
         """
-        logger.debug('v2_runner_on_ok: {0}'.format(result))
+        logger.debug('v2_runner_on_ok: %s', result)
 
         props = []
         if 'results' in result._result.keys():
@@ -518,11 +505,11 @@ class ResultCallback(CallbackBase):
             for key, value in prop.items():
                 if key.startswith(self.ansible_properties.output_prop_prefix):
                     output_facts = { key[len(self.ansible_properties.output_prop_prefix):]: value }
-                    logger.debug('output props = {0}'.format(output_facts))
+                    logger.debug('output props = %s', output_facts)
                     self.properties.update(output_facts)
                 elif key == 'associated_topology':
                     try:
-                        logger.info('associated_topology = {0}'.format(associated_topology)) 
+                        logger.info('associated_topology = %s', associated_topology)
                         self.associated_topology = AssociatedTopology.from_dict(value)
                     except ValueError as ve:
                       self.failure_reason = f'An error has occurred while parsing the ansible fact \'{key}\'. {ve}'
@@ -595,20 +582,20 @@ def get_lifecycle_playbook_path(root_path, transition_name):
 
 def process_templates(parent_dir, templating, all_properties):
   path = parent_dir.get_path()
-  logger.debug('Process templates: walking {0}'.format(path))
+  logger.debug('Process templates: walking %s', path)
 
   for root, dirs, files in os.walk(path):
-    logger.debug('Process templates: files = '.format(files))
+    logger.debug('Process templates: files = %s', files)
     for file in files:
         j2_env = Environment(loader=FileSystemLoader(root), trim_blocks=True)
         path = root + '/' + file
-        logger.debug(f'Processing template {file}')
+        logger.debug('Processing template %s', file)
 
         with open(path, "r") as template_file:
           try:
             template_content = template_file.read()
             content = templating.render(template_content, all_properties)
-            logger.debug('Wrote process template to file {0}'.format(path))
+            logger.debug('Wrote process template to file %s', path)
             with open(path, "w") as template_file_write:
                 template_file_write.write(content)
           except UnicodeDecodeError as ude:
@@ -640,16 +627,16 @@ class KeyPropertyProcessor():
 
   def write_private_key(self, properties, key_prop_name, private_key):
     with NamedTemporaryFile(delete=False, mode='w') as private_key_file:
-      logger.debug('Writing private key file {0}'.format(private_key_file.name))
+      logger.debug('Writing private key file %s', private_key_file.name)
       private_key_value = private_key.get('privateKey', None)
       private_key_file.write(private_key_value)
       private_key_file.flush()
       self.key_files.append(private_key_file)
 
-      logger.debug('Setting property {0}_path'.format(key_prop_name))
+      logger.debug('Setting property %s_path', key_prop_name)
       properties[key_prop_name + '_path'] = private_key_file.name
 
-      logger.debug('Setting property {0}_name'.format(key_prop_name))
+      logger.debug('Setting property %s_name', key_prop_name)
       key_name = private_key.get('keyName', None)
       properties[key_prop_name + '_name'] = key_name
 
@@ -658,5 +645,5 @@ class KeyPropertyProcessor():
   """
   def clear_key_files(self):
     for key_file in self.key_files:
-      logger.debug('Removing private key file {0}'.format(key_file.name))
+      logger.debug('Removing private key file %s', key_file.name)
       os.unlink(key_file.name)
@@ -9,6 +9,7 @@ import traceback
 import threading
 from signal import signal, getsignal, SIGINT, SIGTERM, SIGQUIT, SIGCHLD, SIG_IGN, SIG_DFL
 from multiprocessing import Process, RawValue, Lock, Pipe, active_children
+from multiprocessing.connection import wait
 from multiprocessing.pool import Pool
 from collections import namedtuple
 from ignition.model.lifecycle import LifecycleExecution, STATUS_COMPLETE, STATUS_FAILED, STATUS_IN_PROGRESS
@@ -20,6 +21,11 @@ from ignition.service.requestqueue import RequestHandler
 
 logger = logging.getLogger(__name__)
 
+# how long a pool process waits for its Kafka producer to send outstanding responses before it exits
+PRODUCER_FLUSH_TIMEOUT_SECONDS = 30
+# maximum delay before replacing a pool process that keeps failing
+MAX_RESTART_DELAY_SECONDS = 60
+
 class AnsibleProcessorCapability(Capability):
 
     @interface
@@ -32,6 +38,8 @@ class ProcessProperties(ConfigurationPropertiesGroup):
         # apply defaults (correct settings will be picked up from config file or environment variables)
         self.process_pool_size = 2
         self.use_process_pool = True
+        # number of requests a pool process handles before it exits and is replaced (0 means never recycle)
+        self.max_requests_per_process = 0
 
 class AnsibleProcessorService(Service, AnsibleProcessorCapability):
     def __init__(self, configuration, **kwargs):
@@ -64,10 +72,65 @@ class AnsibleProcessorService(Service, AnsibleProcessorCapability):
         self.shutdown_event = multiprocessing.Event()
         self.pool = [None] * self.process_properties.process_pool_size
         for i in range(self.process_properties.process_pool_size):
-          request_queue = self.request_queue_service.get_lifecycle_request_queue('AnsiblePoolProcess{0}'.format(i), AnsibleRequestHandler(self.messaging_service, self.ansible_client))
-          self.pool[i] = AnsibleProcess('AnsiblePoolProcess{0}'.format(i), request_queue, self.sigchld_handler, self.shutdown_event)
-          self.pool[i].daemon = False
-          self.pool[i].start()
+          self.start_pool_process(i)
+
+        # replace pool processes that exit, either because they have reached max_requests_per_process
+        # or because they died unexpectedly
+        self.pool_monitor_wakeup, self.pool_monitor_notify = Pipe(False)
+        self.pool_monitor = threading.Thread(target=self.monitor_pool, name='AnsiblePoolMonitor', daemon=True)
+        self.pool_monitor.start()
+
+    def start_pool_process(self, i):
+        name = 'AnsiblePoolProcess{0}'.format(i)
+        request_handler = AnsibleRequestHandler(self.messaging_service, self.ansible_client,
+          max_requests=self.process_properties.max_requests_per_process)
+        request_queue = self.request_queue_service.get_lifecycle_request_queue(name, request_handler)
+        self.pool[i] = AnsibleProcess(name, request_queue, self.sigchld_handler, self.shutdown_event, request_handler=request_handler)
+        self.pool[i].daemon = False
+        self.pool[i].start()
+
+    def monitor_pool(self):
+      # consecutive failures (abnormal exits or failed starts) of the process in each pool slot
+      failures = [0] * len(self.pool)
+      # pool slots waiting for a replacement process, mapped to the time the replacement is due to be started
+      restarts = {}
+      # shutdown clears active before setting shutdown_event, so there is no need to check the event here
+      while self.active:
+        now = time.monotonic()
+        for i, start_at in list(restarts.items()):
+          if start_at <= now:
+            del restarts[i]
+            try:
+              self.start_pool_process(i)
+            except Exception as e:
+              # e.g. Kafka is unavailable, so keep retrying rather than leave the pool short of a process
+              failures[i] += 1
+              restarts[i] = now + self.restart_delay(failures[i])
+              logger.exception('Failed to start Ansible Driver process %s, retrying in %s seconds (%s of %s processes running): %s',
+                self.pool[i].name, self.restart_delay(failures[i]), len(self.pool) - len(restarts), len(self.pool), str(e))
+
+        sentinels = {p.sentinel: i for i, p in enumerate(self.pool) if i not in restarts}
+        timeout = max(0, min(restarts.values()) - time.monotonic()) if len(restarts) > 0 else None
+        # block until a pool process exits, shutdown notifies the monitor or a replacement is due to be started
+        for sentinel in wait(list(sentinels.keys()) + [self.pool_monitor_wakeup], timeout):
+          if sentinel not in sentinels:
+            continue
+          i = sentinels[sentinel]
+          self.pool[i].join()
+          # a process that exits cleanly (e.g. after max_requests_per_process) is replaced straight away, but one that keeps
+          # dying (e.g. on startup, because of bad configuration) is replaced with an increasing delay
+          failures[i] = 0 if self.pool[i].exitcode == 0 else failures[i] + 1
+          restarts[i] = time.monotonic() + self.restart_delay(failures[i])
+          if failures[i] == 0:
+            logger.info('Ansible Driver process %s exited, starting a replacement', self.pool[i].name)
+          else:
+            logger.error('Ansible Driver process %s exited with code %s, starting a replacement in %s seconds',
+              self.pool[i].name, self.pool[i].exitcode, self.restart_delay(failures[i]))
+
+    def restart_delay(self, failures):
+      if failures == 0:
+        return 0
+      return min(MAX_RESTART_DELAY_SECONDS, 2 ** (failures - 1))
 
     def sigint_handler(self, sig, frame):
       logger.debug('sigint_handler')
@@ -85,11 +148,13 @@ class AnsibleProcessorService(Service, AnsibleProcessorCapability):
 
         logger.debug('Shutting down process pool')
         self.shutdown_event.set()
+        self.pool_monitor_notify.send(None)
+        self.pool_monitor.join()
         if self.process_properties.use_process_pool:
           logger.debug("Terminating Ansible processes")
           for p in self.pool:
             if p is not None and p.is_alive():
-              logger.debug("Terminating Ansible Driver process {0}".format(p.name))
+              logger.debug("Terminating Ansible Driver process %s", p.name)
               p.join()
 
 
@@ -97,17 +162,19 @@ class AnsibleProcessorService(Service, AnsibleProcessorCapability):
 
 class AnsibleProcess(Process):
 
-    def __init__(self, name, request_queue, sigchld_handler, shutdown_event):
+    def __init__(self, name, request_queue, sigchld_handler, shutdown_event, request_handler=None):
       super(AnsibleProcess, self).__init__(daemon=False)
       self.name = name
       self.request_queue = request_queue
       self.sigchld_handler = sigchld_handler
       self.shutdown_event = shutdown_event
+      # the handler wrapped by request_queue, if any: it decides when this process has handled enough requests
+      self.request_handler = request_handler
 
-      logger.info('Created worker process: {0} {1}'.format(name, self.request_queue))
+      logger.info('Created worker process: %s %s', name, self.request_queue)
 
     def sigint_handler(self, sig, frame):
-      logger.debug('Caught sigint in Ansible Process Worker {0}'.format(self.name))
+      logger.debug('Caught sigint in Ansible Process Worker %s', self.name)
       exit(0)
 
     def run(self):
@@ -116,15 +183,29 @@ class AnsibleProcess(Process):
           # gracefully deal with SIGINT and SIGTERM
           signal(SIGINT, self.sigint_handler)
           signal(SIGTERM, self.sigint_handler)
-          # make sure Ansible processes are acknowledged to avoid zombie processes
-          signal(SIGCHLD, self.sigchld_handler)
+          # make sure Ansible processes are acknowledged to avoid zombie processes. Never inherit SIG_IGN: the kernel
+          # would then auto-reap Ansible's sub-processes and its own waitpid calls on them would fail with ECHILD
+          if self.sigchld_handler is None or self.sigchld_handler == SIG_IGN:
+            signal(SIGCHLD, SIG_DFL)
+          else:
+            signal(SIGCHLD, self.sigchld_handler)
+
+        if self.request_handler is not None:
+          self.request_handler.drop_inherited_producer()
 
-        logger.info('Initialised ansible worker process {0} {1}'.format(self.name, self.request_queue))
+        logger.info('Initialised ansible worker process %s %s', self.name, self.request_queue)
         # continually read from the request queue and process Ansible lifecycle requests
         while not self.shutdown_event.is_set(): 
           # note: process_request handles all exceptions
           self.request_queue.process_request()
+          if self.request_handler is not None and self.request_handler.exhausted():
+            # exit so that the parent replaces this process, releasing any memory accumulated by Ansible
+            logger.info('Ansible worker process %s has handled %s requests, exiting', self.name, self.request_handler.requests_handled)
+            break
       finally:
+        # the process exits without running atexit handlers, so send any responses still buffered by the producer first
+        if self.request_handler is not None:
+          self.request_handler.flush_producer()
         self.request_queue.close()
 
 
@@ -132,43 +213,83 @@ class AnsibleProcess(Process):
 Handler for Ansible driver request queue messages/requests.
 """
 class AnsibleRequestHandler(RequestHandler):
-    def __init__(self, messaging_service, ansible_client):
+    def __init__(self, messaging_service, ansible_client, max_requests=0):
       super(AnsibleRequestHandler, self).__init__()
       self.messaging_service = messaging_service
       self.ansible_client = ansible_client
+      # number of requests to handle before the owning process should be replaced (0 means never)
+      self.max_requests = max_requests
+      self.requests_handled = 0
+      self.inherited_producer = None
+
+    def exhausted(self):
+      return self.max_requests > 0 and self.requests_handled >= self.max_requests
+
+    def delivery_service(self):
+      # ignition's messaging service posts through a postal service, which delivers with a (lazily created) Kafka producer
+      return getattr(getattr(self.messaging_service, 'postal_service', None), 'delivery_service', None)
+
+    def drop_inherited_producer(self):
+      # a Kafka producer created in the parent process is inherited without its sender thread, so anything sent through it
+      # would never be delivered. Drop it, so that the delivery service creates a new producer in this process. A reference
+      # is kept because closing (or garbage collecting) the inherited producer would act on the parent's connections
+      delivery_service = self.delivery_service()
+      if delivery_service is not None and getattr(delivery_service, 'producer', None) is not None:
+        self.inherited_producer = delivery_service.producer
+        delivery_service.producer = None
+
+    def flush_producer(self):
+      delivery_service = self.delivery_service()
+      producer = getattr(delivery_service, 'producer', None)
+      if producer is not None:
+        try:
+          producer.flush(timeout=PRODUCER_FLUSH_TIMEOUT_SECONDS)
+        except Exception as e:
+          logger.exception('Failed to flush Kafka producer: %s', str(e))
+
+    def send_failure(self, request_id, tenant_id, description):
+      self.messaging_service.send_lifecycle_execution(LifecycleExecution(request_id, STATUS_FAILED, FailureDetails(FAILURE_CODE_INTERNAL_ERROR, description), {}), tenant_id=tenant_id)
 
     def handle_request(self, request):
       try:
-        if request is not None:
-          if request.get('logging_context', None) is not None:
-              logging_context.set_from_dict(request['logging_context'])
-
-          if 'request_id' not in request:
-            self.messaging_service.send_lifecycle_execution(LifecycleExecution(None, STATUS_FAILED, FailureDetails(FAILURE_CODE_INTERNAL_ERROR, "Request must have a request_id"), {}), tenant_id=request['tenant_id'])
-          if 'lifecycle_name' not in request:
-            self.messaging_service.send_lifecycle_execution(LifecycleExecution(request['request_id'], STATUS_FAILED, FailureDetails(FAILURE_CODE_INTERNAL_ERROR, "Request must have a lifecycle_name"), {}), tenant_id=request['tenant_id'])
-          if 'driver_files' not in request:
-            self.messaging_service.send_lifecycle_execution(LifecycleExecution(request['request_id'], STATUS_FAILED, FailureDetails(FAILURE_CODE_INTERNAL_ERROR, "Request must have a driver_files"), {}), tenant_id=request['tenant_id'])
- 
-          # run the playbook and send the response to the response queue
-          logger.debug('Ansible worker running request {0}'.format(request))
-          result = self.ansible_client.run_lifecycle_playbook(request)
-          if result is not None:
-            logger.debug('Ansible worker finished for request {0}: {1}'.format(request, result))
-            self.messaging_service.send_lifecycle_execution(result, tenant_id=request['tenant_id'])
-          else:
-            logger.warning("Empty response from Ansible worker for request {0}".format(request))
-        else:
+        if request is None:
           logger.warning('Null lifecycle request from request queue')
+          return
+
+        self.requests_handled += 1
+
+        if request.get('logging_context', None) is not None:
+          logging_context.set_from_dict(request['logging_context'])
+
+        # reject invalid requests without running a playbook
+        if 'request_id' not in request:
+          self.send_failure(None, request['tenant_id'], "Request must have a request_id")
+          return
+        if 'lifecycle_name' not in request:
+          self.send_failure(request['request_id'], request['tenant_id'], "Request must have a lifecycle_name")
+          return
+        if 'driver_files' not in request:
+          self.send_failure(request['request_id'], request['tenant_id'], "Request must have a driver_files")
+          return
+
+        # run the playbook and send the response to the response queue
+        logger.debug('Ansible worker running request %s', request)
+        result = self.ansible_client.run_lifecycle_playbook(request)
+        if result is None:
+          logger.warning("Empty response from Ansible worker for request %s", request)
+          return
+
+        logger.debug('Ansible worker finished for request %s: %s', request, result)
+        self.messaging_service.send_lifecycle_execution(result, tenant_id=request['tenant_id'])
       except Exception as e:
-        logger.error('Unexpected exception {0}'.format(e))
+        logger.error('Unexpected exception %s', e)
         traceback.print_exc(file=sys.stderr)
         # don't want the worker to die without knowing the cause, so catch all exceptions
         if request is not None:
-          self.messaging_service.send_lifecycle_execution(LifecycleExecution(request['request_id'], STATUS_FAILED, FailureDetails(FAILURE_CODE_INTERNAL_ERROR, "Unexpected exception: {0}".format(e)), {}), tenant_id=request['tenant_id'])
+          self.send_failure(request.get('request_id', None), request['tenant_id'], "Unexpected exception: {0}".format(e))
       finally:
         # clean up zombie processes (Ansible can leave these behind)
         for p in active_children():
-          logger.debug("removed zombie process {0}".format(p.name))
+          logger.debug("removed zombie process %s", p.name)
 
 
@@ -75,9 +75,11 @@ class TestProcess(unittest.TestCase):
 
         messaging_service = MagicMock()
         ansible_client = MagicMock()
-        handler = AnsibleRequestHandler(messaging_service, ansible_client)
+        handler = AnsibleRequestHandler(messaging_service, ansible_client, max_requests=1)
 
         handler.handle_request(None)
+        self.assertEqual(handler.requests_handled, 0)
+        self.assertFalse(handler.exhausted())
 
     def test_run_lifecycle_missing_request_id(self):
         # this is needed to ensure logging output appears in test context - see https://stackoverflow.com/questions/7472863/pydev-unittesting-how-to-capture-text-logged-to-a-logging-logger-in-captured-o
@@ -98,6 +100,8 @@ class TestProcess(unittest.TestCase):
           'tenant_id': '1234'
         })
         self.check_response_only(LifecycleExecution(None, STATUS_FAILED, FailureDetails(FAILURE_CODE_INTERNAL_ERROR, "Request must have a request_id"), {}))
+        self.mock_ansible_client.run_lifecycle_playbook.assert_not_called()
+        self.assertEqual(self.mock_messaging_service.send_lifecycle_execution.call_count, 1)
 
     def test_run_lifecycle_missing_lifecycle_name(self):
         # this is needed to ensure logging output appears in test context - see https://stackoverflow.com/questions/7472863/pydev-unittesting-how-to-capture-text-logged-to-a-logging-logger-in-captured-o
@@ -118,6 +122,8 @@ class TestProcess(unittest.TestCase):
           'tenant_id': '1234'
         })
         self.check_response_only(LifecycleExecution(request_id, STATUS_FAILED, FailureDetails(FAILURE_CODE_INTERNAL_ERROR, "Request must have a lifecycle_name"), {}))
+        self.mock_ansible_client.run_lifecycle_playbook.assert_not_called()
+        self.assertEqual(self.mock_messaging_service.send_lifecycle_execution.call_count, 1)
 
     def test_run_lifecycle_missing_driver_files(self):
         # this is needed to ensure logging output appears in test context - see https://stackoverflow.com/questions/7472863/pydev-unittesting-how-to-capture-text-logged-to-a-logging-logger-in-captured-o
@@ -138,6 +144,8 @@ class TestProcess(unittest.TestCase):
           'tenant_id': '1234'
         })
         self.check_response_only(LifecycleExecution(request_id, STATUS_FAILED, FailureDetails(FAILURE_CODE_INTERNAL_ERROR, "Request must have a driver_files"), {}))
+        self.mock_ansible_client.run_lifecycle_playbook.assert_not_called()
+        self.assertEqual(self.mock_messaging_service.send_lifecycle_execution.call_count, 1)
 
     def test_run_lifecycle(self):
         # this is needed to ensure logging output appears in test context - see https://stackoverflow.com/questions/7472863/pydev-unittesting-how-to-capture-text-logged-to-a-logging-logger-in-captured-o
@@ -170,6 +178,93 @@ class TestProcess(unittest.TestCase):
           'prop1': 'output__value1'
         }))
 
+    def build_processor_service(self, request_queue_service, process_pool_size=1, max_requests_per_process=0):
+        property_groups = PropertyGroups()
+        property_groups.add_property_group(AnsibleProperties())
+        process_props = ProcessProperties()
+        process_props.process_pool_size = process_pool_size
+        process_props.max_requests_per_process = max_requests_per_process
+        property_groups.add_property_group(process_props)
+        configuration = BootstrapApplicationConfiguration(app_name='test', property_sources=[], property_groups=property_groups, service_configurators=[], api_configurators=[], api_error_converter=None)
+
+        # the service installs its own signal handlers, so restore the test's handlers afterwards
+        for sig in [signal.SIGINT, signal.SIGTERM]:
+          self.addCleanup(signal.signal, sig, signal.getsignal(sig))
+        return AnsibleProcessorService(configuration, messaging_service=self.mock_messaging_service,
+          request_queue_service=request_queue_service, ansible_client=self.mock_ansible_client)
+
+    def wait_for_pids(self, r, count):
+        pids = set()
+        deadline = time.monotonic() + 10
+        while len(pids) < count and r.poll(max(0, deadline - time.monotonic())):
+          pids.add(r.recv())
+        return pids
+
+    def assert_shutdown(self, service):
+        service.shutdown()
+        self.assertFalse(service.pool_monitor.is_alive())
+        for p in service.pool:
+          self.assertFalse(p.is_alive())
+        service.request_queue_service.close.assert_called_once()
+
+    def test_processor_service_replaces_exited_process(self):
+        # this is needed to ensure logging output appears in test context - see https://stackoverflow.com/questions/7472863/pydev-unittesting-how-to-capture-text-logged-to-a-logging-logger-in-captured-o
+        stream_handler.stream = sys.stdout
+
+        r, w = multiprocessing.Pipe(False)
+
+        request_queue_service = MagicMock()
+        request_queue_service.get_lifecycle_request_queue.side_effect = lambda name, request_handler: TestPidRequestQueueHandler(w, request_handler)
+        service = self.build_processor_service(request_queue_service, max_requests_per_process=1)
+        try:
+          # each process exits after one request, so a second process can only have been started as a replacement
+          self.assertEqual(len(self.wait_for_pids(r, 2)), 2)
+        finally:
+          self.assert_shutdown(service)
+
+    def test_processor_service_retries_failed_start(self):
+        # this is needed to ensure logging output appears in test context - see https://stackoverflow.com/questions/7472863/pydev-unittesting-how-to-capture-text-logged-to-a-logging-logger-in-captured-o
+        stream_handler.stream = sys.stdout
+
+        r, w = multiprocessing.Pipe(False)
+
+        request_queue_service = MagicMock()
+        request_queues = [lambda request_handler: TestPidRequestQueueHandler(w, request_handler), None, lambda request_handler: TestPidRequestQueueHandler(w, request_handler)]
+        def get_lifecycle_request_queue(name, request_handler):
+          request_queue = request_queues.pop(0) if len(request_queues) > 0 else None
+          if request_queue is None:
+            raise ValueError('Kafka is unavailable')
+          return request_queue(request_handler)
+        request_queue_service.get_lifecycle_request_queue.side_effect = get_lifecycle_request_queue
+        service = self.build_processor_service(request_queue_service, max_requests_per_process=1)
+        try:
+          # the first replacement fails to start, so the second process must have been started by a retry
+          self.assertEqual(len(self.wait_for_pids(r, 2)), 2)
+          self.assertGreaterEqual(request_queue_service.get_lifecycle_request_queue.call_count, 3)
+        finally:
+          self.assert_shutdown(service)
+
+    def test_processor_service_shutdown_wakes_pool_monitor(self):
+        # this is needed to ensure logging output appears in test context - see https://stackoverflow.com/questions/7472863/pydev-unittesting-how-to-capture-text-logged-to-a-logging-logger-in-captured-o
+        stream_handler.stream = sys.stdout
+
+        r, w = multiprocessing.Pipe(False)
+
+        request_queue_service = MagicMock()
+        request_queue_service.get_lifecycle_request_queue.side_effect = lambda name, request_handler: TestSlowRequestQueueHandler(w)
+        service = self.build_processor_service(request_queue_service)
+        self.assertEqual(len(self.wait_for_pids(r, 1)), 1)
+
+        shutdown_thread = threading.Thread(target=service.shutdown)
+        shutdown_thread.start()
+        # the pool process is still busy with a request, so the monitor can only have been woken by shutdown
+        service.pool_monitor.join(1)
+        self.assertFalse(service.pool_monitor.is_alive())
+        self.assertTrue(service.pool[0].is_alive())
+        shutdown_thread.join()
+        self.assertFalse(service.pool[0].is_alive())
+        request_queue_service.close.assert_called_once()
+
     def test_ansible_process(self):
         # this is needed to ensure logging output appears in test context - see https://stackoverflow.com/questions/7472863/pydev-unittesting-how-to-capture-text-logged-to-a-logging-logger-in-captured-o
         stream_handler.stream = sys.stdout
@@ -204,17 +299,158 @@ class TestProcess(unittest.TestCase):
 
         ansible_process.join()
 
+    def test_ansible_process_exits_after_max_requests(self):
+        # this is needed to ensure logging output appears in test context - see https://stackoverflow.com/questions/7472863/pydev-unittesting-how-to-capture-text-logged-to-a-logging-logger-in-captured-o
+        stream_handler.stream = sys.stdout
+
+        r, w = multiprocessing.Pipe(False)
+
+        request_handler = AnsibleRequestHandler(self.mock_messaging_service, self.mock_ansible_client, max_requests=2)
+        request_queue = TestKafkaRequestQueueHandler(w, request_handler)
+        shutdown_event = multiprocessing.Event()
+        ansible_process = AnsibleProcess("Test", request_queue, signal.SIG_DFL, shutdown_event, request_handler=request_handler)
+        ansible_process.start()
+
+        # close write end of pipe in parent
+        w.close()
+
+        ansible_process.join(10)
+        if ansible_process.is_alive():
+          shutdown_event.set()
+          ansible_process.join()
+          self.fail('Ansible process did not exit after max_requests')
+        self.assertEqual(ansible_process.exitcode, 0)
+
+        received = 0
+        try:
+          while True:
+            r.recv()
+            received += 1
+        except EOFError:
+          pass
+        self.assertEqual(received, 2)
+
+    def test_ansible_process_does_not_use_inherited_producer(self):
+        # this is needed to ensure logging output appears in test context - see https://stackoverflow.com/questions/7472863/pydev-unittesting-how-to-capture-text-logged-to-a-logging-logger-in-captured-o
+        stream_handler.stream = sys.stdout
+
+        r, w = multiprocessing.Pipe(False)
+
+        # a producer created in this (parent) process before the Ansible process is forked
+        self.mock_messaging_service.postal_service.delivery_service.producer = 'inherited'
+        request_handler = AnsibleRequestHandler(self.mock_messaging_service, self.mock_ansible_client, max_requests=1)
+        request_queue = TestProducerRequestQueueHandler(w, request_handler)
+        shutdown_event = multiprocessing.Event()
+        ansible_process = AnsibleProcess("Test", request_queue, signal.SIG_DFL, shutdown_event, request_handler=request_handler)
+        ansible_process.start()
+
+        # close write end of pipe in parent
+        w.close()
+
+        ansible_process.join(10)
+        if ansible_process.is_alive():
+          shutdown_event.set()
+          ansible_process.join()
+          self.fail('Ansible process did not exit after max_requests')
+
+        received = []
+        try:
+          while True:
+            received.append(r.recv())
+        except EOFError:
+          pass
+        # the request is handled without the inherited producer and the new producer is flushed before the process exits
+        self.assertEqual(received, [None, 'flushed'])
+        self.assertEqual(self.mock_messaging_service.postal_service.delivery_service.producer, 'inherited')
+
+    def test_ansible_process_does_not_ignore_sigchld(self):
+        # this is needed to ensure logging output appears in test context - see https://stackoverflow.com/questions/7472863/pydev-unittesting-how-to-capture-text-logged-to-a-logging-logger-in-captured-o
+        stream_handler.stream = sys.stdout
+
+        r, w = multiprocessing.Pipe(False)
+
+        request_queue = TestSigchldRequestQueueHandler(w)
+        shutdown_event = multiprocessing.Event()
+        ansible_process = AnsibleProcess("Test", request_queue, signal.SIG_IGN, shutdown_event)
+        ansible_process.start()
+
+        # close write end of pipe in parent
+        w.close()
+
+        try:
+          if not r.poll(5):
+            self.fail('Timeout waiting for response')
+          self.assertEqual(r.recv(), signal.SIG_DFL)
+        finally:
+          shutdown_event.set()
+          ansible_process.join()
+
 
 class TestKafkaRequestQueueHandler(KafkaRequestQueueHandler):
-    def __init__(self, pipeout):
+    def __init__(self, pipeout, request_handler=None):
       self.pipeout = pipeout
+      self.request_handler = request_handler
       self.closed = False
 
     def process_request(self):
       self.pipeout.send(json.dumps({
         "request_id": "123"
       }).encode())
-      time.sleep(1)
+      if self.request_handler is not None:
+        self.request_handler.handle_request({
+          'request_id': '123',
+          'lifecycle_name': 'Install',
+          'driver_files': DirectoryTree(tempfile.gettempdir()),
+          'tenant_id': '1234'
+        })
+      else:
+        time.sleep(1)
 
     def close(self):
       self.closed = True
+
+
+class TestPidRequestQueueHandler(TestKafkaRequestQueueHandler):
+    def process_request(self):
+      self.pipeout.send(os.getpid())
+      self.request_handler.handle_request({
+        'request_id': '123',
+        'lifecycle_name': 'Install',
+        'driver_files': DirectoryTree(tempfile.gettempdir()),
+        'tenant_id': '1234'
+      })
+      time.sleep(0.1)
+
+
+class TestSlowRequestQueueHandler(TestKafkaRequestQueueHandler):
+    def process_request(self):
+      self.pipeout.send(os.getpid())
+      time.sleep(3)
+
+
+class TestSigchldRequestQueueHandler(TestKafkaRequestQueueHandler):
+    def process_request(self):
+      self.pipeout.send(signal.getsignal(signal.SIGCHLD))
+      time.sleep(1)
+
+
+class TestProducer():
+    def __init__(self, pipeout):
+      self.pipeout = pipeout
+
+    def flush(self, timeout=None):
+      self.pipeout.send('flushed')
+
+
+class TestProducerRequestQueueHandler(TestKafkaRequestQueueHandler):
+    def process_request(self):
+      delivery_service = self.request_handler.delivery_service()
+      self.pipeout.send(delivery_service.producer)
+      # the delivery service lazily creates a producer when the response is sent
+      delivery_service.producer = TestProducer(self.pipeout)
+      self.request_handler.handle_request({
+        'request_id': '123',
+        'lifecycle_name': 'Install',
+        'driver_files': DirectoryTree(tempfile.gettempdir()),
+        'tenant_id': '1234'
+      })